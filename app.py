@@ -1,15 +1,29 @@
 import os
-import json
+import orjson
 import uuid
 import time
 import hashlib
-from io import BytesIO
+import anyio
+import asyncio
+import httpx
+from contextlib import asynccontextmanager
+import tiktoken
 from dotenv import load_dotenv
-from openai import OpenAI
-from pypdf import PdfReader
-from fastapi import FastAPI, UploadFile, File, Header, HTTPException
-from fastapi.responses import JSONResponse
+from openai import AsyncOpenAI
+from cachetools import TTLCache
+from fastapi import APIRouter, FastAPI, UploadFile, File, Header, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from pdf import extract_text_from_pdf, is_clearly_not_acord, shutdown_page_executor
+from schemas import ACORD_130, BASIC, USER_PREFIX
+from semantic_cache import SemanticCache
+
+# BLAKE3 uses SIMD and is several times faster than SHA-256; fall back if missing
+try:
+    from blake3 import blake3 as file_hasher
+except ImportError:
+    from hashlib import sha256 as file_hasher
 
 # -----------------------------
 # Load Environment
@@ -20,15 +34,148 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 API_SECRET = os.getenv("API_SECRET")
 MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
 
+# Strict structured outputs can't fail schema validation, so retries are only
+# for transport and server errors
+LLM_RETRIES = 2
+
 if not OPENAI_API_KEY:
     print("WARNING: OPENAI_API_KEY not found")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Created in lifespan() so the HTTP pool belongs to the serving event loop
+client = None
+
+# Set CACHE_DIR to an empty string to disable the response cache
+CACHE_DIR = os.getenv("CACHE_DIR", "./llm_cache")
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_THRESHOLD", "0.95"))
+SEMANTIC_MAX_ENTRIES = int(os.getenv("SEMANTIC_MAX_ENTRIES", "5000"))
+
+# How often each worker saves its new semantic entries and picks up other workers'
+SEMANTIC_SYNC_INTERVAL = float(os.getenv("SEMANTIC_SYNC_INTERVAL", "30"))
+
+PROFILES = [BASIC, ACORD_130]
+
+# One semantic index per profile; results from different schemas never mix
+semantic_caches = {}
+
+# Extraction memory is bounded per page, so the upload cap can be raised safely
+MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "5"))
+MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Room for multipart boundaries and part headers on top of the file bytes
+MULTIPART_OVERHEAD = 64 * 1024
+
+# ACORD fields cluster in the first pages; cap what we pay to send
+MAX_INPUT_TOKENS = int(os.getenv("MAX_INPUT_TOKENS", "12000"))
+
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "20"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+
+# 🚦 LLM_MAX_INFLIGHT is the host-wide cap on in-flight OpenAI calls. Semaphores
+# are per worker, so each gunicorn worker gets an equal share (WEB_CONCURRENCY
+# is exported by gunicorn.conf.py). With several hosts/replicas, set it to the
+# account's budget divided by the replica count. Callers that can't get a slot
+# within LLM_QUEUE_TIMEOUT are rejected instead of piling up.
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "8"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "2.0"))
+
+# Returns (worker_slots, batch_slots). Batches get at most half the worker's
+# slots and never all of them, so single requests always have one in reserve;
+# a worker with a single slot serves no uncached batch files at all.
+def llm_slots(max_inflight, web_concurrency):
+    if web_concurrency > max_inflight:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={web_concurrency} exceeds LLM_MAX_INFLIGHT={max_inflight}: "
+            "every worker needs at least one LLM slot, so lower the worker count or raise the cap"
+        )
+    worker_slots = max_inflight // web_concurrency
+    return worker_slots, worker_slots // 2
+
+LLM_WORKER_INFLIGHT, LLM_BATCH_INFLIGHT = llm_slots(LLM_MAX_INFLIGHT, WEB_CONCURRENCY)
+LLM_SEM = asyncio.Semaphore(LLM_WORKER_INFLIGHT)
+BATCH_LLM_SEM = asyncio.Semaphore(LLM_BATCH_INFLIGHT) if LLM_BATCH_INFLIGHT else None
+
+if not LLM_BATCH_INFLIGHT:
+    print(
+        f"WARNING: {LLM_WORKER_INFLIGHT} LLM slot per worker leaves none for batches; "
+        "uncached batch files will get 503 (raise LLM_MAX_INFLIGHT or lower WEB_CONCURRENCY)"
+    )
+
+if CACHE_DIR:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for profile in PROFILES:
+        semantic_caches[profile["name"]] = SemanticCache(
+            os.path.join(CACHE_DIR, f"semantic-{MODEL_NAME}-{profile['name']}-{profile['prompt_version']}"),
+            threshold=SEMANTIC_THRESHOLD,
+            max_entries=SEMANTIC_MAX_ENTRIES
+        )
+
+# Extracted text by file hash; shared across profiles and survives prompt
+# changes that invalidate the LLM cache. Only touched from the event loop,
+# so no lock is needed.
+TEXT_CACHE = TTLCache(maxsize=256, ttl=3600)
+
+# -----------------------------
+# App Lifespan
+# -----------------------------
+# Loading and saving the semantic index touches disk and inserts into hnswlib,
+# so it runs on a worker thread in the background, never in a request
+async def sync_semantic_caches():
+    while True:
+        for name, semantic_cache in semantic_caches.items():
+            try:
+                await anyio.to_thread.run_sync(semantic_cache.save)
+            except Exception as e:
+                print(f"Semantic cache sync failed for {name}: {str(e)}")
+        await asyncio.sleep(SEMANTIC_SYNC_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app):
+    global client
+
+    # One pooled HTTP/2 connection set per worker, shared by chat and embedding
+    # calls, so concurrent requests multiplex instead of paying new TLS handshakes
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=60.0
+    )
+
+    # The SDK retries connection errors, timeouts, 429s and 5xx with backoff
+    client = AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=LLM_RETRIES, http_client=http_client)
+
+    sync_task = asyncio.create_task(sync_semantic_caches())
+
+    try:
+        yield
+    finally:
+        # Cancelling waits for an in-progress save thread, so the final save
+        # below never overlaps it
+        sync_task.cancel()
+        try:
+            await sync_task
+        except asyncio.CancelledError:
+            pass
+        for name, semantic_cache in semantic_caches.items():
+            try:
+                await anyio.to_thread.run_sync(semantic_cache.save)
+            except Exception as e:
+                print(f"Semantic cache save failed for {name}: {str(e)}")
+        shutdown_page_executor()
+        await http_client.aclose()
 
 # -----------------------------
 # Initialize App
 # -----------------------------
-app = FastAPI(title="ACORD Extraction API", version="2.0")
+app = FastAPI(
+    title="ACORD Extraction API",
+    version="2.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
 # -----------------------------
 # CORS Setup
@@ -41,6 +188,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# -----------------------------
+# Request Size Limit
+# -----------------------------
+# Starlette parses and spools the whole multipart body before an endpoint runs,
+# so the upload cap has to be enforced here, before parsing: reject on
+# Content-Length, and stop reading chunked or mislabelled bodies at the cap.
+class BodySizeLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        if scope["path"].endswith("/batch"):
+            limit = MAX_BATCH_FILES * (MAX_FILE_SIZE + MULTIPART_OVERHEAD)
+        else:
+            limit = MAX_FILE_SIZE + MULTIPART_OVERHEAD
+        detail = f"Request too large (max {MAX_FILE_SIZE_MB}MB per file)"
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    too_large = int(value) > limit
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    response = ORJSONResponse(status_code=413, content={"detail": detail})
+                    return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the endpoint's body parsing, so FastAPI
+                    # turns it into a 413 response
+                    raise StarletteHTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(BodySizeLimitMiddleware)
+
 # -----------------------------
 # Root & Health
 # -----------------------------
@@ -53,171 +247,331 @@ def health():
     return {"status": "healthy"}
 
 # -----------------------------
-# PDF Text Extraction
+# AI Extraction Logic
 # -----------------------------
-def extract_text_from_pdf(file_bytes):
-    reader = PdfReader(BytesIO(file_bytes))
-    text = ""
-    for page in reader.pages:
-        extracted = page.extract_text()
-        if extracted:
-            text += extracted + "\n"
-    return text
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+encoding = None
+encoding_failed = False
+
+# tiktoken downloads its BPE file on first use (unless TIKTOKEN_CACHE_DIR holds
+# a copy), so load it lazily and never let a failed fetch break the worker
+def get_encoding():
+    global encoding, encoding_failed
+    if encoding is None and not encoding_failed:
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(MODEL_NAME)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            encoding_failed = True
+            print(f"WARNING: tiktoken unavailable, using character budget: {str(e)}")
+    return encoding
+
+# Returns (text, dropped_token_count); the count is estimated without tiktoken
+def truncate_to_tokens(text, max_tokens=MAX_INPUT_TOKENS):
+    enc = get_encoding()
+    if enc is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text, 0
+        return text[:max_chars], (len(text) - max_chars) // CHARS_PER_TOKEN
+
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text, 0
+    return enc.decode(tokens[:max_tokens]), len(tokens) - max_tokens
+
+class LLMBusyError(Exception):
+    pass
+
+async def extract_json_from_text(text, profile, batch=False):
+    # Batch files wait for the batch share without a timeout; the batch itself
+    # is already bounded by MAX_BATCH_FILES
+    if batch:
+        if BATCH_LLM_SEM is None:
+            raise LLMBusyError("No LLM slots reserved for batches")
+        await BATCH_LLM_SEM.acquire()
 
-# -----------------------------
-# Chunking for Large PDFs
-# -----------------------------
-def chunk_text(text, size=3000):
-    return [text[i:i+size] for i in range(0, len(text), size)]
+    try:
+        try:
+            await asyncio.wait_for(LLM_SEM.acquire(), timeout=LLM_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise LLMBusyError(f"All {LLM_WORKER_INFLIGHT} LLM slots busy")
+
+        try:
+            response = await client.chat.completions.create(
+                model=MODEL_NAME,
+                response_format=profile["response_format"],
+                messages=[
+                    profile["system_message"],
+                    {"role": "user", "content": USER_PREFIX + text}
+                ]
+            )
+        finally:
+            LLM_SEM.release()
+    finally:
+        if batch:
+            BATCH_LLM_SEM.release()
 
-# -----------------------------
-# AI Extraction Logic
-# -----------------------------
-def extract_json_from_text(text):
-
-    prompt = """
-You are an expert insurance ACORD 130 (Workers Compensation) extraction engine.
-
-Return STRICT valid JSON only.
-
-Schema:
-{
-  "agency_information": {
-    "agency_name": string | null,
-    "agency_address": string | null,
-    "producer_name": string | null
-  },
-  "applicant_information": {
-    "applicant_name": string | null,
-    "entity_type": string | null,
-    "mailing_address": string | null,
-    "phone": string | null,
-    "email": string | null
-  },
-  "policy_information": {
-    "effective_date": string | null,
-    "expiration_date": string | null,
-    "state": string | null,
-    "financed": boolean | null
-  },
-  "limits": {
-    "each_accident": string | null,
-    "disease_policy_limit": string | null,
-    "disease_each_employee": string | null
-  },
-  "locations": [
-    {
-      "location_number": string | null,
-      "address": string | null
-    }
-  ],
-  "rating_information": [
-    {
-      "class_code": string | null,
-      "description": string | null,
-      "number_of_employees": string | null,
-      "estimated_payroll": string | null
-    }
-  ],
-  "owners_officers": [
-    {
-      "name": string | null,
-      "dob": string | null,
-      "title": string | null,
-      "ownership_percent": string | null,
-      "class_code": string | null,
-      "payroll": string | null
-    }
-  ],
-  "nature_of_business": string | null,
-  "general_information": {
-    "questions": [
-      {
-        "question_number": integer,
-        "answer": "Y" | "N" | null
-      }
-    ]
-  }
-}
-
-If value not found, return null.
-"""
-
-
-    response = client.chat.completions.create(
-        model=MODEL_NAME,
-        response_format={"type": "json_object"},
-        messages=[
-            {"role": "system", "content": "You are a strict JSON extraction engine."},
-            {"role": "user", "content": prompt + "\n\nDocument Text:\n" + text}
-        ]
-    )
+    message = response.choices[0].message
+    if message.refusal:
+        raise ValueError(f"Model refused extraction: {message.refusal}")
 
-    return json.loads(response.choices[0].message.content)
+    return orjson.loads(message.content)
 
 # -----------------------------
-# Main Extraction Endpoint
+# LLM Response Cache
 # -----------------------------
-@app.post("/extract-acord")
-async def extract_acord(
-    file: UploadFile = File(...),
-    x_api_key: str = Header(None)
-):
+def cache_key(profile, file_hash):
+    return hashlib.sha256(
+        f"{MODEL_NAME}|{profile['name']}|{profile['prompt_version']}|{file_hash}".encode()
+    ).hexdigest()
 
-    request_id = str(uuid.uuid4())
+def load_cached_response(key):
+    if not CACHE_DIR:
+        return None
 
-    # 🔐 API Authentication
-    if API_SECRET and x_api_key != API_SECRET:
-        raise HTTPException(status_code=401, detail="Unauthorized")
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())["data"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+def save_cached_response(key, profile, data):
+    if not CACHE_DIR:
+        return
+
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    entry = {
+        "model": MODEL_NAME,
+        "profile": profile["name"],
+        "prompt_version": profile["prompt_version"],
+        "created_at": time.time(),
+        "data": data
+    }
 
+    # Write to a temp file then rename so readers never see a partial entry
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(entry))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Cache write failed for {key}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def normalize_for_match(value):
+    return " ".join(value.split()).lower()
+
+# Forms on the same ACORD template share most of their text, so a close
+# embedding alone can belong to another insured. Only reuse a semantic hit if
+# its applicant name and policy dates also appear in the new document.
+def identity_matches(profile, data, text):
+    haystack = normalize_for_match(text)
+    found = 0
+    for path in profile["identity_fields"]:
+        value = data
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if not value:
+            continue
+        if normalize_for_match(str(value)) not in haystack:
+            return False
+        found += 1
+    return found > 0
+
+async def embed_text(text):
+    response = await client.embeddings.create(model=EMBEDDING_MODEL, input=text[:8000])
+    return response.data[0].embedding
+
+# -----------------------------
+# Single PDF Processing
+# -----------------------------
+# Returns (status_code, content) so the single and batch endpoints can share it
+async def process_upload(file, request_id, profile, batch=False):
     if file.content_type != "application/pdf":
-        return JSONResponse(
-            status_code=400,
-            content={"error": "Only PDF files allowed", "request_id": request_id}
-        )
+        return 400, {"error": "Only PDF files allowed", "request_id": request_id}
+
+    # 📏 The request body is already capped by BodySizeLimitMiddleware; this
+    # applies the per-file limit inside a batch or an overhead-padded body
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        return 400, {"error": f"File too large (max {MAX_FILE_SIZE_MB}MB)", "request_id": request_id}
 
     try:
         start_time = time.time()
 
-        file_bytes = await file.read()
+        # Starlette has already spooled the upload to a temp file (on disk past
+        # 1 MB), so stream it in chunks to 🔍 hash it without materialising
+        # another copy
+        hasher = file_hasher()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+        await file.seek(0)
 
-        # 📏 File Size Limit (5MB)
-        if len(file_bytes) > 5 * 1024 * 1024:
-            return JSONResponse(
-                status_code=400,
-                content={"error": "File too large (max 5MB)", "request_id": request_id}
-            )
-
-        # 🔍 Optional: hash file (future caching support)
-        file_hash = hashlib.md5(file_bytes).hexdigest()
+        file_hash = hasher.hexdigest()
         print(f"[{request_id}] File Hash: {file_hash}")
 
-        text = extract_text_from_pdf(file_bytes)
+        key = cache_key(profile, file_hash)
+        cached = load_cached_response(key)
+        if cached is not None:
+            print(f"[{request_id}] Cache hit in {time.time() - start_time:.2f} seconds")
+            return 200, {
+                "status": "success",
+                "request_id": request_id,
+                "data": cached
+            }
+
+        text = TEXT_CACHE.get(file_hash)
+        if text is None:
+            text = await anyio.to_thread.run_sync(extract_text_from_pdf, file.file)
+            TEXT_CACHE[file_hash] = text
+        else:
+            print(f"[{request_id}] Text cache hit")
 
         if not text.strip():
-            return JSONResponse(
-                status_code=400,
-                content={"error": "No readable text found in PDF", "request_id": request_id}
-            )
-
-        # 📦 Chunk if large
-        chunks = chunk_text(text)
-        combined_text = "\n".join(chunks)
-
-        data = extract_json_from_text(combined_text)
+            return 400, {"error": "No readable text found in PDF", "request_id": request_id}
+
+        # 🧾 Skip the embedding and LLM round-trips for receipts, invoices and
+        # other documents that are clearly not ACORD forms
+        if is_clearly_not_acord(text):
+            return 422, {"error": "Not an ACORD form", "request_id": request_id}
+
+        # ✂️ Bound cost and stay inside the context window on huge PDFs
+        text, dropped = await anyio.to_thread.run_sync(truncate_to_tokens, text)
+        if dropped:
+            print(f"[{request_id}] Truncated input, dropped {dropped} tokens")
+
+        # 🧠 Semantic cache: reuse results for near-duplicate documents
+        embedding = None
+        semantic_cache = semantic_caches.get(profile["name"])
+        if semantic_cache:
+            try:
+                embedding = await embed_text(text)
+                cached, score = await anyio.to_thread.run_sync(semantic_cache.lookup, embedding)
+                if cached is not None and not identity_matches(profile, cached, text):
+                    print(f"[{request_id}] Semantic match rejected, identity differs (score {score:.3f})")
+                    cached = None
+                if cached is not None:
+                    # Not promoted into the exact cache, so a bad match never becomes permanent
+                    print(f"[{request_id}] Semantic cache hit (score {score:.3f})")
+                    return 200, {
+                        "status": "success",
+                        "request_id": request_id,
+                        "data": cached
+                    }
+            except Exception as e:
+                print(f"[{request_id}] Semantic cache lookup failed: {str(e)}")
+
+        data = await extract_json_from_text(text, profile, batch=batch)
+        save_cached_response(key, profile, data)
+        if semantic_cache and embedding is not None:
+            # A cache failure must not fail an extraction that already succeeded
+            try:
+                await anyio.to_thread.run_sync(semantic_cache.add, embedding, data)
+            except Exception as e:
+                print(f"[{request_id}] Semantic cache add failed: {str(e)}")
 
         end_time = time.time()
         print(f"[{request_id}] Extraction completed in {end_time - start_time:.2f} seconds")
 
-        return {
+        return 200, {
             "status": "success",
             "request_id": request_id,
             "data": data
         }
 
+    except LLMBusyError as e:
+        print(f"[{request_id}] BUSY: {str(e)}")
+        return 503, {"error": "Server busy, retry later", "request_id": request_id}
+
     except Exception as e:
         print(f"[{request_id}] ERROR: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"error": str(e), "request_id": request_id}
-        )
+        return 500, {"error": str(e), "request_id": request_id}
+
+# -----------------------------
+# Versioned Routers
+# -----------------------------
+def build_router(profile, prefix=""):
+    router = APIRouter(prefix=prefix)
+
+    # -----------------------------
+    # Main Extraction Endpoint
+    # -----------------------------
+    @router.post("/extract-acord")
+    async def extract_acord(
+        file: UploadFile = File(...),
+        x_api_key: str = Header(None)
+    ):
+
+        request_id = str(uuid.uuid4())
+
+        # 🔐 API Authentication
+        if API_SECRET and x_api_key != API_SECRET:
+            raise HTTPException(status_code=401, detail="Unauthorized")
+
+        status_code, content = await process_upload(file, request_id, profile)
+        return ORJSONResponse(status_code=status_code, content=content)
+
+    # -----------------------------
+    # Batch Extraction Endpoint
+    # -----------------------------
+    @router.post("/extract-acord/batch")
+    async def extract_acord_batch(
+        files: list[UploadFile] = File(...),
+        x_api_key: str = Header(None)
+    ):
+
+        batch_id = str(uuid.uuid4())
+
+        # 🔐 API Authentication
+        if API_SECRET and x_api_key != API_SECRET:
+            raise HTTPException(status_code=401, detail="Unauthorized")
+
+        if len(files) > MAX_BATCH_FILES:
+            return ORJSONResponse(
+                status_code=400,
+                content={"error": f"Too many files (max {MAX_BATCH_FILES})", "request_id": batch_id}
+            )
+
+        # 🚀 Fan out concurrently; wall-clock is roughly one file's latency
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def process_one(file):
+            async with semaphore:
+                request_id = str(uuid.uuid4())
+                status_code, content = await process_upload(file, request_id, profile, batch=True)
+                return {"filename": file.filename, "status_code": status_code, **content}
+
+        start_time = time.time()
+        results = await asyncio.gather(*(process_one(file) for file in files))
+        print(f"[{batch_id}] Batch of {len(files)} completed in {time.time() - start_time:.2f} seconds")
+
+        succeeded = sum(1 for result in results if result["status_code"] == 200)
+        if succeeded == len(results):
+            status = "success"
+        elif succeeded:
+            status = "partial"
+        else:
+            status = "failed"
+
+        return {
+            "status": status,
+            "request_id": batch_id,
+            "results": results
+        }
+
+    return router
+
+# v1: basic ACORD fields; v2: full ACORD 130. Unprefixed routes stay on v2
+# for existing clients.
+app.include_router(build_router(BASIC, prefix="/v1"))
+app.include_router(build_router(ACORD_130, prefix="/v2"))
+app.include_router(build_router(ACORD_130))
@@ -0,0 +1,36 @@
+import os
+import multiprocessing
+
+# -----------------------------
+# Gunicorn Settings
+# -----------------------------
+# Run with: gunicorn -c gunicorn.conf.py app:app
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# LLM calls are I/O bound, so run the classic 2*CPU+1 workers unless overridden.
+# app.LLM_MAX_INFLIGHT is split between workers, so by default stop at two LLM
+# slots per worker: one for batches and one kept for single requests.
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "8"))
+workers = int(os.getenv(
+    "WEB_CONCURRENCY",
+    min(2 * multiprocessing.cpu_count() + 1, max(1, LLM_MAX_INFLIGHT // 2))
+))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Workers inherit this, so per-worker pools (pdf.PAGE_WORKERS) can size
+# themselves against the real worker count. With the 2*CPU+1 default each
+# worker gets a single page process, which disables PARALLEL_PAGES; lower
+# WEB_CONCURRENCY or set PAGE_WORKERS to use it.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Extraction waits on OpenAI; give slow responses room before killing the worker
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app in each worker after fork so the OpenAI client, semantic
+# index, page pool and file handles are per-worker rather than shared
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
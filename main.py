@@ -2,7 +2,8 @@ import os
 import json
 from dotenv import load_dotenv
 from openai import OpenAI
-from pypdf import PdfReader
+from pdf import extract_text_from_pdf
+from schemas import BASIC, BASIC_SCHEMA, USER_PREFIX
 
 # Load environment variables
 load_dotenv()
@@ -15,55 +16,15 @@ client = OpenAI(api_key=api_key)
 
 
 # -----------------------------
-# 1️⃣ Extract Text from PDF
-# -----------------------------
-def extract_text_from_pdf(file_path):
-    reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        extracted = page.extract_text()
-        if extracted:
-            text += extracted + "\n"
-    return text
-
-
-# -----------------------------
-# 2️⃣ Extract Structured JSON
+# 1️⃣ Extract Structured JSON
 # -----------------------------
 def extract_json_from_text(text):
-    prompt = """
-You are an expert insurance ACORD form extraction engine.
-
-Carefully analyze the document text and extract structured data.
-
-Important:
-- Class code is usually a 4 or 5 digit number near business classification.
-- Liability limit is typically a monetary value like 1,000,000.
-- Policy dates are in MM/DD/YYYY format.
-- Address should include street, city, state, and zip if available.
-
-Return ONLY valid JSON. No explanation. No markdown.
-
-Fields:
-- agency_name
-- insured_name
-- insured_address
-- policy_start_date
-- policy_end_date
-- state
-- liability_limit
-- class_code
-- business_description
-
-If a value is not clearly present, return null.
-"""
-
     response = client.chat.completions.create(
         model="gpt-4o-mini",
-        response_format={"type": "json_object"},  # 🔥 Enforce strict JSON
+        response_format=BASIC["response_format"],  # 🔥 Enforce strict JSON schema
         messages=[
-            {"role": "system", "content": "You are a strict JSON extraction engine."},
-            {"role": "user", "content": prompt + "\n\nDocument Text:\n" + text}
+            BASIC["system_message"],
+            {"role": "user", "content": USER_PREFIX + text}
         ]
     )
 
@@ -71,20 +32,10 @@ If a value is not clearly present, return null.
 
 
 # -----------------------------
-# 3️⃣ Validate Output
+# 2️⃣ Validate Output
 # -----------------------------
 def validate_output(data):
-    required_fields = [
-        "agency_name",
-        "insured_name",
-        "insured_address",
-        "policy_start_date",
-        "policy_end_date",
-        "state",
-        "liability_limit",
-        "class_code",
-        "business_description"
-    ]
+    required_fields = BASIC_SCHEMA["required"]
 
     for field in required_fields:
         if field not in data:
@@ -94,7 +45,7 @@ def validate_output(data):
 
 
 # -----------------------------
-# 4️⃣ Main Execution
+# 3️⃣ Main Execution
 # -----------------------------
 if __name__ == "__main__":
     pdf_path = "sample_policy.pdf"
@@ -0,0 +1,136 @@
+import os
+import multiprocessing
+import re
+import shutil
+import tempfile
+import threading
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import pypdfium2 as pdfium
+
+# -----------------------------
+# Document Screening
+# -----------------------------
+# Filled ACORD forms are usually flattened: the labels are part of the template
+# artwork and the text layer holds only values, so the absence of ACORD terms
+# proves nothing. Only reject documents that carry no ACORD term and at least
+# two distinct receipt/invoice markers.
+ACORD_ANCHOR = re.compile(r"\bACORD\b|Workers.?Compensation|Class Code|Policy Number", re.I)
+NON_ACORD_SIGNAL = re.compile(
+    r"\b(?:receipt|invoice|sub-?total|amount due|balance due|change due|cashier"
+    r"|order (?:no|number|#)|bill to|ship to|qty|thank you for (?:your )?(?:purchase|shopping|order))\b",
+    re.I
+)
+MIN_NON_ACORD_SIGNALS = 2
+
+def is_clearly_not_acord(text):
+    if ACORD_ANCHOR.search(text):
+        return False
+    # Distinct markers, so a receipt listing "Subtotal" per item counts once
+    signals = {" ".join(match.lower().replace("-", "").split()) for match in NON_ACORD_SIGNAL.findall(text)}
+    return len(signals) >= MIN_NON_ACORD_SIGNALS
+
+# -----------------------------
+# PDF Text Extraction
+# -----------------------------
+# Set PARALLEL_PAGES=1 to extract large PDFs across a process pool
+PARALLEL_PAGES = os.getenv("PARALLEL_PAGES") == "1"
+PAGES_PER_TASK = 8
+
+# Every gunicorn worker owns its own pool, so split the host's cores between
+# workers instead of giving each one cpu_count() processes
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+PAGE_WORKERS = int(os.getenv("PAGE_WORKERS", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))))
+
+# The default 2*CPU+1 gunicorn workers leave each worker less than one core, so
+# parallel extraction only kicks in with fewer workers or an explicit PAGE_WORKERS
+if PARALLEL_PAGES and PAGE_WORKERS < 2:
+    print(
+        f"WARNING: PARALLEL_PAGES=1 ignored, {WEB_CONCURRENCY} workers on "
+        f"{os.cpu_count()} CPUs leave {PAGE_WORKERS} page worker each; set PAGE_WORKERS to override"
+    )
+
+page_executor = None
+PAGE_EXECUTOR_LOCK = threading.Lock()
+
+# PDFium is not thread-safe, so serialize access within a process
+PDFIUM_LOCK = threading.Lock()
+
+def iter_page_texts(pdf, start, stop):
+    # Pull one page at a time and release it before loading the next, so
+    # memory is bounded by a single page's decoded content streams rather
+    # than the whole document tree. PDFium's C text extractor also skips the
+    # path/fill/colour operators that make pypdf slow on graphics-heavy pages.
+    for i in range(start, stop):
+        page = pdf[i]
+        textpage = page.get_textpage()
+        try:
+            yield textpage.get_text_bounded()
+        finally:
+            textpage.close()
+            page.close()
+
+def extract_page_range(source, start, stop):
+    # Runs in a single-threaded pool process, so it re-opens the PDF from its
+    # path and needs no PDFIUM_LOCK
+    pdf = pdfium.PdfDocument(source)
+    try:
+        return list(iter_page_texts(pdf, start, stop))
+    finally:
+        pdf.close()
+
+def get_page_executor():
+    # Created lazily so each uvicorn worker gets its own pool. Children are
+    # spawned, not forked: forking a threaded server can copy PDFIUM_LOCK (or
+    # any other lock) while another request holds it, hanging the child.
+    # Called from anyio worker threads, so guard creation or two concurrent
+    # requests could each build a pool and leak one
+    global page_executor
+    with PAGE_EXECUTOR_LOCK:
+        if page_executor is None:
+            page_executor = ProcessPoolExecutor(
+                max_workers=PAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return page_executor
+
+def shutdown_page_executor():
+    global page_executor
+    with PAGE_EXECUTOR_LOCK:
+        if page_executor:
+            page_executor.shutdown(wait=False, cancel_futures=True)
+            page_executor = None
+
+def extract_text_from_pdf(source):
+    # source is a file path or a seekable file-like object; PDFium reads from
+    # it on demand
+    extracted = None
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            page_count = len(pdf)
+            if not PARALLEL_PAGES or PAGE_WORKERS < 2 or page_count <= PAGES_PER_TASK:
+                extracted = [text for text in iter_page_texts(pdf, 0, page_count) if text]
+        finally:
+            pdf.close()
+
+    if extracted is None:
+        # Hand workers a path so each task pickles a short string rather than
+        # the whole PDF; file-like uploads are copied to disk once
+        tmp_path = None
+        if hasattr(source, "read"):
+            source.seek(0)
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                shutil.copyfileobj(source, tmp)
+            source = tmp_path = tmp.name
+
+        try:
+            starts = range(0, page_count, PAGES_PER_TASK)
+            stops = [min(start + PAGES_PER_TASK, page_count) for start in starts]
+            batches = get_page_executor().map(extract_page_range, repeat(source), starts, stops)
+            extracted = [text for batch in batches for text in batch if text]
+        finally:
+            if tmp_path:
+                os.remove(tmp_path)
+
+    return "".join(page + "\n" for page in extracted)
@@ -0,0 +1,170 @@
+# Per-request user content is USER_PREFIX + document text
+USER_PREFIX = "Document Text:\n"
+
+# -----------------------------
+# Schema Helpers
+# -----------------------------
+# Strict structured outputs: every key is required and no extra keys are
+# allowed, so missing values come back as null rather than being dropped.
+def strict_object(properties):
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
+
+NULLABLE_STRING = {"type": ["string", "null"]}
+
+def response_format(name, schema):
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": schema, "strict": True}
+    }
+
+# -----------------------------
+# v1: Basic ACORD Fields
+# -----------------------------
+BASIC_SCHEMA = strict_object({
+    "agency_name": NULLABLE_STRING,
+    "insured_name": NULLABLE_STRING,
+    "insured_address": {
+        "anyOf": [
+            strict_object({
+                "street": NULLABLE_STRING,
+                "city": NULLABLE_STRING,
+                "state": NULLABLE_STRING,
+                "zip": NULLABLE_STRING
+            }),
+            {"type": "null"}
+        ]
+    },
+    "policy_start_date": NULLABLE_STRING,
+    "policy_end_date": NULLABLE_STRING,
+    "state": NULLABLE_STRING,
+    "liability_limit": NULLABLE_STRING,
+    "class_code": NULLABLE_STRING,
+    "business_description": NULLABLE_STRING
+})
+
+BASIC_PROMPT = """
+You are an expert insurance ACORD form extraction engine.
+
+Carefully analyze the document text and extract structured data.
+
+Important:
+- Class code is usually a 4 or 5 digit number near business classification.
+- Liability limit is typically a monetary value like 1,000,000.
+- Policy dates are in MM/DD/YYYY format.
+- Address should include street, city, state, and zip if available.
+
+If a value is not clearly present, return null.
+"""
+
+# -----------------------------
+# v2: ACORD 130 (Workers Compensation)
+# -----------------------------
+ACORD_130_SCHEMA = strict_object({
+    "agency_information": strict_object({
+        "agency_name": NULLABLE_STRING,
+        "agency_address": NULLABLE_STRING,
+        "producer_name": NULLABLE_STRING
+    }),
+    "applicant_information": strict_object({
+        "applicant_name": NULLABLE_STRING,
+        "entity_type": NULLABLE_STRING,
+        "mailing_address": NULLABLE_STRING,
+        "phone": NULLABLE_STRING,
+        "email": NULLABLE_STRING
+    }),
+    "policy_information": strict_object({
+        "effective_date": NULLABLE_STRING,
+        "expiration_date": NULLABLE_STRING,
+        "state": NULLABLE_STRING,
+        "financed": {"type": ["boolean", "null"]}
+    }),
+    "limits": strict_object({
+        "each_accident": NULLABLE_STRING,
+        "disease_policy_limit": NULLABLE_STRING,
+        "disease_each_employee": NULLABLE_STRING
+    }),
+    "locations": {
+        "type": "array",
+        "items": strict_object({
+            "location_number": NULLABLE_STRING,
+            "address": NULLABLE_STRING
+        })
+    },
+    "rating_information": {
+        "type": "array",
+        "items": strict_object({
+            "class_code": NULLABLE_STRING,
+            "description": NULLABLE_STRING,
+            "number_of_employees": NULLABLE_STRING,
+            "estimated_payroll": NULLABLE_STRING
+        })
+    },
+    "owners_officers": {
+        "type": "array",
+        "items": strict_object({
+            "name": NULLABLE_STRING,
+            "dob": NULLABLE_STRING,
+            "title": NULLABLE_STRING,
+            "ownership_percent": NULLABLE_STRING,
+            "class_code": NULLABLE_STRING,
+            "payroll": NULLABLE_STRING
+        })
+    },
+    "nature_of_business": NULLABLE_STRING,
+    "general_information": strict_object({
+        "questions": {
+            "type": "array",
+            "items": strict_object({
+                "question_number": {"type": "integer"},
+                "answer": {"type": ["string", "null"], "enum": ["Y", "N", None]}
+            })
+        }
+    })
+})
+
+ACORD_130_PROMPT = """
+You are an expert insurance ACORD 130 (Workers Compensation) extraction engine.
+
+Important:
+- Class code is usually a 4 or 5 digit number near business classification.
+- Liability limit is typically a monetary value like 1,000,000.
+- Policy dates are in MM/DD/YYYY format.
+- Address should include street, city, state, and zip if available.
+
+If value not found, return null.
+"""
+
+# -----------------------------
+# Extraction Profiles
+# -----------------------------
+# System messages are built once here and sent byte-identical on every call;
+# never interpolate request data into them. OpenAI only caches prompt prefixes
+# of 1024+ tokens, which these prompts (plus the response schema) may not reach,
+# so treat any prompt-caching benefit as unmeasured.
+# Bump prompt_version whenever a prompt or schema changes so stale cache
+# entries are ignored. identity_fields are the paths a semantic cache hit
+# must find verbatim in the new document before it is reused.
+BASIC = {
+    "name": "basic",
+    "prompt_version": "v1",
+    "system_message": {"role": "system", "content": BASIC_PROMPT},
+    "identity_fields": [("insured_name",), ("policy_start_date",), ("policy_end_date",)],
+    "response_format": response_format("acord_basic", BASIC_SCHEMA)
+}
+
+ACORD_130 = {
+    "name": "acord130",
+    "prompt_version": "v5",
+    "system_message": {"role": "system", "content": ACORD_130_PROMPT},
+    "identity_fields": [
+        ("applicant_information", "applicant_name"),
+        ("policy_information", "effective_date"),
+        ("policy_information", "expiration_date")
+    ],
+    "response_format": response_format("acord", ACORD_130_SCHEMA)
+}
@@ -0,0 +1,194 @@
+import os
+import time
+import fcntl
+import orjson
+import threading
+from collections import deque
+import numpy as np
+import hnswlib
+
+
+# -----------------------------
+# Semantic Cache
+# -----------------------------
+SEGMENT_PREFIX = "segment-"
+
+# hnswlib inserts are the slow part, so new entries are added in small batches
+# and lookups on the event loop never wait long for the lock
+INSERT_BATCH = 64
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of extraction results keyed by text embeddings.
+
+    Catches re-scanned or re-emailed copies of the same form whose bytes
+    differ but whose extracted text is effectively identical.
+
+    Every save writes only this worker's new entries, as an immutable segment
+    file in the cache directory. Other gunicorn workers pick a segment up by
+    adding it to their live index, so the index is never rebuilt. Both the
+    directory and the live index hold at most max_entries: the oldest
+    segments are deleted, and the oldest live entries are evicted and their
+    index slots reused.
+    """
+
+    def __init__(self, cache_dir, dim=1536, threshold=0.95, max_entries=5000):
+        self.dim = dim
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.lock_path = os.path.join(cache_dir, "segments.lock")
+        self.lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.index = hnswlib.Index(space="cosine", dim=dim)
+        self.index.init_index(max_elements=max_entries, ef_construction=200, M=16, allow_replace_deleted=True)
+        self.index.set_ef(50)
+
+        # Live entries by label, oldest first
+        self.payloads = {}
+        self.labels = deque()
+        self.next_label = 0
+
+        # Segment files already in the live index
+        self.loaded = set()
+
+        # Entries added by this worker since the last save
+        self.pending_vectors = []
+        self.pending_payloads = []
+
+    def lookup(self, vector):
+        """Return (data, score) for the closest entry above threshold, else (None, score)."""
+        with self.lock:
+            if not self.payloads:
+                return None, 0.0
+
+            labels, distances = self.index.knn_query(np.asarray(vector, dtype=np.float32), k=1)
+            payload = self.payloads[int(labels[0][0])]
+
+        # hnswlib cosine distance is 1 - cosine similarity
+        score = 1.0 - float(distances[0][0])
+        if score >= self.threshold:
+            return payload, score
+        return None, score
+
+    def add(self, vector, data):
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Expected a {self.dim}-dim embedding, got shape {vector.shape}")
+
+        with self.lock:
+            self._insert(vector[np.newaxis], [data])
+            self.pending_vectors.append(vector)
+            self.pending_payloads.append(data)
+
+            # Bound memory if saves keep failing
+            del self.pending_vectors[:-self.max_entries]
+            del self.pending_payloads[:-self.max_entries]
+
+    def sync(self):
+        """Add segments saved by other workers to the live index. Blocking."""
+        for name in self._list_segments():
+            if name in self.loaded:
+                continue
+
+            try:
+                vectors, payloads = self._read_segment(name)
+            except FileNotFoundError:
+                # Deleted by another worker's size cap since we listed it
+                continue
+
+            for start in range(0, len(payloads), INSERT_BATCH):
+                with self.lock:
+                    self._insert(vectors[start:start + INSERT_BATCH], payloads[start:start + INSERT_BATCH])
+            self.loaded.add(name)
+
+    def save(self):
+        """Sync, then write pending entries as a new segment. Blocking."""
+        self.sync()
+
+        with self.lock:
+            vectors, payloads = self.pending_vectors, self.pending_payloads
+            self.pending_vectors, self.pending_payloads = [], []
+
+        if not payloads:
+            return
+
+        try:
+            with _FileLock(self.lock_path):
+                # Named under the lock so name order is save order
+                name = f"{SEGMENT_PREFIX}{time.time_ns():020d}-{os.getpid()}-{len(payloads)}.npz"
+                path = os.path.join(self.cache_dir, name)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.savez(
+                        f,
+                        vectors=np.stack(vectors),
+                        payloads=np.frombuffer(orjson.dumps(payloads), dtype=np.uint8)
+                    )
+                os.replace(tmp_path, path)
+
+                # Our own entries are already in the live index
+                self.loaded.add(name)
+                self._trim_segments()
+        except Exception:
+            # Keep the entries for the next save
+            with self.lock:
+                self.pending_vectors[:0] = vectors
+                self.pending_payloads[:0] = payloads
+            raise
+
+    def _insert(self, vectors, payloads):
+        # Caller holds self.lock
+        vectors = vectors[-self.max_entries:]
+        payloads = payloads[-self.max_entries:]
+
+        while len(self.labels) + len(payloads) > self.max_entries:
+            label = self.labels.popleft()
+            self.index.mark_deleted(label)
+            del self.payloads[label]
+
+        labels = list(range(self.next_label, self.next_label + len(payloads)))
+        self.index.add_items(vectors, labels, replace_deleted=True)
+        self.next_label += len(payloads)
+        self.labels.extend(labels)
+        self.payloads.update(zip(labels, payloads))
+
+    def _list_segments(self):
+        return sorted(
+            name for name in os.listdir(self.cache_dir)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(".npz")
+        )
+
+    def _read_segment(self, name):
+        with np.load(os.path.join(self.cache_dir, name), allow_pickle=False) as segment:
+            return segment["vectors"], orjson.loads(segment["payloads"].tobytes())
+
+    def _trim_segments(self):
+        # Caller holds the file lock. Entry counts are in the names, so the
+        # cap is enforced without opening any segment.
+        names = self._list_segments()
+        total = sum(int(name[:-len(".npz")].rsplit("-", 1)[1]) for name in names)
+        while total > self.max_entries and len(names) > 1:
+            name = names.pop(0)
+            total -= int(name[:-len(".npz")].rsplit("-", 1)[1])
+            os.remove(os.path.join(self.cache_dir, name))
+
+        self.loaded &= set(names)
+
+
+class _FileLock:
+    """Exclusive flock shared by every process using the same cache directory."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
@@ -0,0 +1,69 @@
+import os
+import sys
+import types
+import orjson
+import pytest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Disable the on-disk caches so every upload exercises the full pipeline
+os.environ["CACHE_DIR"] = ""
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+SAMPLE_PDF = ROOT / "sample_policy.pdf"
+
+
+class StubCompletions:
+    def __init__(self, data=None):
+        self.calls = []
+        self.data = data if data is not None else {"stub": True}
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = types.SimpleNamespace(refusal=None, content=orjson.dumps(self.data).decode())
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def stub_llm():
+    # Replaces the OpenAI client that lifespan() creates; use inside a
+    # TestClient context so lifespan has already run
+    import app
+
+    completions = StubCompletions()
+
+    def install():
+        app.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        return completions
+
+    return install
+
+
+def make_text_pdf(lines):
+    # Minimal one-page PDF with one Helvetica text line per entry
+    stream = "BT /F1 12 Tf 72 720 Td 14 TL " + " ".join(
+        "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") '"
+        for line in lines
+    ) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
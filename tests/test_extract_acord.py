@@ -0,0 +1,75 @@
+from fastapi.testclient import TestClient
+
+import app
+from conftest import SAMPLE_PDF, make_text_pdf
+
+
+def test_sample_policy_reaches_llm(stub_llm):
+    # The sample is a filled, flattened ACORD 130: its labels live in the form
+    # template, so the text layer only holds values. It must still reach the LLM
+    # with every page's values intact.
+    with TestClient(app.app) as client:
+        completions = stub_llm()
+        with open(SAMPLE_PDF, "rb") as f:
+            response = client.post(
+                "/extract-acord",
+                files={"file": ("sample_policy.pdf", f, "application/pdf")}
+            )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {"stub": True}
+    assert len(completions.calls) == 1
+
+    user_content = completions.calls[0]["messages"][-1]["content"]
+    assert "ABREGO CONTRACTOR LLC" in user_content
+    assert "5645 CARPENTRY 70,000" in user_content
+    assert "CARPENTRY/REMODELING INTERIOR." in user_content
+
+
+def post_pdf(client, name, content):
+    return client.post("/extract-acord", files={"file": (name, content, "application/pdf")})
+
+
+def test_receipt_rejected_without_llm_call(stub_llm):
+    receipt = make_text_pdf([
+        "CORNER MARKET",
+        "Receipt #1042  Cashier: Dana",
+        "Milk 1gal  4.29",
+        "Subtotal  12.50",
+        "Tax  1.00",
+        "Thank you for shopping with us!",
+    ])
+
+    with TestClient(app.app) as client:
+        completions = stub_llm()
+        response = post_pdf(client, "receipt.pdf", receipt)
+
+    assert response.status_code == 422
+    assert response.json()["error"] == "Not an ACORD form"
+    assert completions.calls == []
+
+
+def test_acord_terms_override_receipt_signals(stub_llm):
+    # ACORD cover pages can mention invoices and billing; an anchor always wins
+    form = make_text_pdf([
+        "ACORD 130 WORKERS COMPENSATION APPLICATION",
+        "Invoice billing: Bill to insured, amount due at binding",
+    ])
+
+    with TestClient(app.app) as client:
+        completions = stub_llm()
+        response = post_pdf(client, "form.pdf", form)
+
+    assert response.status_code == 200
+    assert len(completions.calls) == 1
+
+
+def test_single_non_acord_signal_is_not_enough(stub_llm):
+    letter = make_text_pdf(["Dear customer,", "Please find your invoice attached."])
+
+    with TestClient(app.app) as client:
+        completions = stub_llm()
+        response = post_pdf(client, "letter.pdf", letter)
+
+    assert response.status_code == 200
+    assert len(completions.calls) == 1
@@ -0,0 +1,86 @@
+import asyncio
+import types
+import httpx
+import orjson
+import pytest
+
+import app
+from conftest import SAMPLE_PDF
+
+
+def test_slots_split_across_workers():
+    assert app.llm_slots(8, 1) == (8, 4)
+    assert app.llm_slots(8, 4) == (2, 1)
+    assert app.llm_slots(8, 3) == (2, 1)
+
+
+def test_single_slot_reserves_nothing_for_batches():
+    assert app.llm_slots(8, 8) == (1, 0)
+
+
+def test_more_workers_than_slots_fails_loudly():
+    with pytest.raises(RuntimeError, match="WEB_CONCURRENCY=9 exceeds LLM_MAX_INFLIGHT=8"):
+        app.llm_slots(8, 9)
+
+
+class SlowCompletions:
+    def __init__(self, delay):
+        self.delay = delay
+        self.inflight = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.inflight -= 1
+        message = types.SimpleNamespace(refusal=None, content=orjson.dumps({"stub": True}).decode())
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def run_batch_and_single(monkeypatch, worker_slots, batch_slots, delay):
+    # Semaphores bind to the loop that first waits on them, so make fresh ones
+    monkeypatch.setattr(app, "LLM_SEM", asyncio.Semaphore(worker_slots))
+    monkeypatch.setattr(app, "BATCH_LLM_SEM", asyncio.Semaphore(batch_slots) if batch_slots else None)
+    monkeypatch.setattr(app, "LLM_WORKER_INFLIGHT", worker_slots)
+    monkeypatch.setattr(app, "LLM_QUEUE_TIMEOUT", delay / 2)
+
+    completions = SlowCompletions(delay)
+    pdf = SAMPLE_PDF.read_bytes()
+
+    async def main():
+        async with app.lifespan(app.app):
+            app.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+            transport = httpx.ASGITransport(app=app.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+                files = [("files", (f"{i}.pdf", pdf, "application/pdf")) for i in range(4)]
+                batch = asyncio.create_task(client.post("/extract-acord/batch", files=files))
+                await asyncio.sleep(delay / 4)
+                single = await client.post(
+                    "/extract-acord",
+                    files={"file": ("single.pdf", pdf, "application/pdf")}
+                )
+                return single, await batch
+
+    single, batch = asyncio.run(main())
+    return single, batch.json(), completions
+
+
+def test_single_request_gets_reserved_slot_during_batch(monkeypatch):
+    # The single request's queue timeout is shorter than one LLM call, so it
+    # only succeeds if a slot was held back from the batch
+    single, batch, completions = run_batch_and_single(monkeypatch, worker_slots=2, batch_slots=1, delay=0.4)
+
+    assert single.status_code == 200
+    assert batch["status"] == "success"
+    assert completions.peak == 2
+
+
+def test_batch_without_reserved_slots_leaves_single_requests_served(monkeypatch):
+    single, batch, completions = run_batch_and_single(monkeypatch, worker_slots=1, batch_slots=0, delay=0.4)
+
+    assert single.status_code == 200
+    assert batch["status"] == "failed"
+    assert {result["status_code"] for result in batch["results"]} == {503}
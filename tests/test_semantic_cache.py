@@ -0,0 +1,105 @@
+import types
+import multiprocessing
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app
+from conftest import SAMPLE_PDF
+from semantic_cache import SemanticCache
+
+DIM = 32
+WRITERS = [("ALICE", 1), ("BOB", 2), ("CAROL", 3)]
+
+
+def vector(seed):
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+def write_entries(cache_dir, name, seed, count, barrier):
+    cache = SemanticCache(cache_dir, dim=DIM)
+    barrier.wait()
+    for i in range(count):
+        cache.add(vector(seed * 100 + i), {"insured": f"{name}-{i}"})
+        if i % 3 == 2:
+            cache.save()
+    cache.save()
+
+
+def test_forked_writers_keep_every_entry(tmp_path):
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(len(WRITERS))
+    processes = [
+        context.Process(target=write_entries, args=(str(tmp_path), name, seed, 7, barrier))
+        for name, seed in WRITERS
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = SemanticCache(str(tmp_path), dim=DIM)
+    cache.sync()
+
+    assert len(cache.payloads) == 21
+    for name, seed in WRITERS:
+        for i in range(7):
+            data, score = cache.lookup(vector(seed * 100 + i))
+            assert data == {"insured": f"{name}-{i}"}
+            assert score > 0.99
+
+
+def test_sync_adds_only_new_segments(tmp_path):
+    reader = SemanticCache(str(tmp_path), dim=DIM)
+    writer = SemanticCache(str(tmp_path), dim=DIM)
+
+    writer.add(vector(1), {"insured": "first"})
+    writer.save()
+    reader.sync()
+    assert reader.lookup(vector(1))[0] == {"insured": "first"}
+
+    writer.add(vector(2), {"insured": "second"})
+    writer.save()
+    reader.sync()
+    reader.sync()
+    assert len(reader.payloads) == 2
+    assert reader.lookup(vector(2))[0] == {"insured": "second"}
+
+
+def test_store_and_index_are_capped(tmp_path):
+    cache = SemanticCache(str(tmp_path), dim=DIM, max_entries=5)
+    for i in range(12):
+        cache.add(vector(i), {"insured": str(i)})
+        cache.save()
+
+    # Oldest entries are evicted from the live index and the directory
+    assert len(cache.payloads) == 5
+    assert cache.lookup(vector(0))[0] is None
+    assert cache.lookup(vector(11))[0] == {"insured": "11"}
+
+    fresh = SemanticCache(str(tmp_path), dim=DIM, max_entries=5)
+    fresh.sync()
+    assert sorted(int(data["insured"]) for data in fresh.payloads.values()) == list(range(7, 12))
+
+
+def test_failed_cache_add_keeps_extraction(stub_llm, tmp_path, monkeypatch):
+    # A wrong embedding dimension makes add() raise; the extraction still succeeds
+    cache = SemanticCache(str(tmp_path), dim=DIM)
+    monkeypatch.setitem(app.semantic_caches, app.ACORD_130["name"], cache)
+
+    async def embed(**kwargs):
+        return types.SimpleNamespace(data=[types.SimpleNamespace(embedding=[0.1] * (DIM + 1))])
+
+    with TestClient(app.app) as client:
+        completions = stub_llm()
+        app.client.embeddings = types.SimpleNamespace(create=embed)
+        with open(SAMPLE_PDF, "rb") as f:
+            response = client.post(
+                "/extract-acord",
+                files={"file": ("sample_policy.pdf", f, "application/pdf")}
+            )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {"stub": True}
+    assert len(completions.calls) == 1
+    assert cache.payloads == {}
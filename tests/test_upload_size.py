@@ -0,0 +1,53 @@
+from fastapi.testclient import TestClient
+
+import app
+
+
+def multipart_body(size):
+    boundary = "sizelimit"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="big.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + b"\0" * size + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def test_oversized_content_length_rejected_before_parsing(stub_llm):
+    body, content_type = multipart_body(app.MAX_FILE_SIZE + app.MULTIPART_OVERHEAD)
+
+    with TestClient(app.app) as client:
+        completions = stub_llm()
+        response = client.post("/extract-acord", content=body, headers={"Content-Type": content_type})
+
+    assert response.status_code == 413
+    assert completions.calls == []
+
+
+def test_oversized_chunked_body_stops_at_limit(stub_llm):
+    body, content_type = multipart_body(app.MAX_FILE_SIZE + app.MULTIPART_OVERHEAD)
+    chunk_size = 256 * 1024
+
+    # A generator body goes out chunked, with no Content-Length to check
+    def stream():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    with TestClient(app.app) as client:
+        completions = stub_llm()
+        response = client.post("/extract-acord", content=stream(), headers={"Content-Type": content_type})
+
+    assert response.status_code == 413
+    assert completions.calls == []
+
+
+def test_batch_allows_several_files_up_to_the_per_file_cap(stub_llm):
+    # Each file is under the cap even though the batch body is larger than one
+    files = [("files", (f"{i}.pdf", b"\0" * (app.MAX_FILE_SIZE - 1), "application/pdf")) for i in range(2)]
+
+    with TestClient(app.app) as client:
+        stub_llm()
+        response = client.post("/extract-acord/batch", files=files)
+
+    assert response.status_code == 200
+    assert all(result["status_code"] != 413 for result in response.json()["results"])